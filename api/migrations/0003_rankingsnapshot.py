@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-15 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_supplierranking_tier'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.CharField(help_text='ID reference to Product in Warehouse Service', max_length=100)),
+                ('city', models.CharField(blank=True, default='', help_text='Lower-cased city filter, empty for all cities', max_length=100)),
+                ('payload', models.JSONField(help_text='Ranked suppliers response')),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('product_id', 'city')},
+            },
+        ),
+    ]
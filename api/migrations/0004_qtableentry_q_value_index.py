@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-15 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_rankingsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='qtableentry',
+            index=models.Index(fields=['-q_value'], name='api_qtable_q_value_desc_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-15 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_qtableentry_q_value_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='rankingsnapshot',
+            name='payload',
+            field=models.JSONField(blank=True, help_text='Ranked suppliers response, empty while being computed', null=True),
+        ),
+        migrations.AddField(
+            model_name='rankingsnapshot',
+            name='state_ids',
+            field=models.JSONField(blank=True, default=list, help_text='IDs of the Q-learning states the ranking was built from'),
+        ),
+        migrations.AddField(
+            model_name='rankingsnapshot',
+            name='supplier_ids',
+            field=models.JSONField(blank=True, default=list, help_text='IDs of the ranked suppliers'),
+        ),
+    ]
@@ -33,6 +33,10 @@ class QTableEntry(models.Model):
     
     class Meta:
         unique_together = ('state', 'action')
+        indexes = [
+            # Q-table exports filter on and order by the highest Q-values
+            models.Index(fields=['-q_value'], name='api_qtable_q_value_desc_idx'),
+        ]
     
     def __str__(self):
         return f"{self.state.name} - {self.action.name}: {self.q_value}"
@@ -157,4 +161,24 @@ class RankingEvent(models.Model):
     metadata = models.JSONField(null=True, blank=True)
     
     def __str__(self):
-        return f"{self.event_type} - {self.timestamp}"
\ No newline at end of file
+        return f"{self.event_type} - {self.timestamp}"
+
+
+class RankingSnapshot(models.Model):
+    """
+    Precomputed supplier ranking response for a product and city
+    Served by the ranking endpoint until it expires or rankings change
+    """
+    
+    product_id = models.CharField(max_length=100, help_text="ID reference to Product in Warehouse Service")
+    city = models.CharField(max_length=100, blank=True, default="", help_text="Lower-cased city filter, empty for all cities")
+    payload = models.JSONField(null=True, blank=True, help_text="Ranked suppliers response, empty while being computed")
+    state_ids = models.JSONField(default=list, blank=True, help_text="IDs of the Q-learning states the ranking was built from")
+    supplier_ids = models.JSONField(default=list, blank=True, help_text="IDs of the ranked suppliers")
+    computed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ('product_id', 'city')
+    
+    def __str__(self):
+        return f"Ranking snapshot for product {self.product_id} in {self.city or 'all cities'}"
@@ -99,6 +99,34 @@ class SupplierRankingInputSerializer(serializers.Serializer):
     )
 
 
+class PassThroughField(serializers.Field):
+    """Accepts any value and returns it unchanged, whichever parser produced it"""
+    
+    def to_internal_value(self, data):
+        return data
+    
+    def to_representation(self, value):
+        return value
+
+
+class SupplierFeedbackSerializer(serializers.Serializer):
+    supplier_id = serializers.IntegerField(required=True, help_text="Supplier ID")
+    # Passed through unchanged, so that the product ID is echoed back as sent
+    product_id = PassThroughField(required=False, allow_null=True, default=None, help_text="Product ID")
+    city = serializers.CharField(required=False, allow_null=True, allow_blank=True, default=None, help_text="City location")
+
+
+class SupplierQValueQuerySerializer(serializers.Serializer):
+    supplier_id = serializers.IntegerField(required=True, help_text="Supplier ID")
+
+
+class QTableQuerySerializer(serializers.Serializer):
+    state = serializers.CharField(required=False, default=None, help_text="Filter by state name")
+    action = serializers.CharField(required=False, default=None, help_text="Filter by action name")
+    min_q_value = serializers.FloatField(required=False, default=None, help_text="Minimum Q-value to include")
+    limit = serializers.IntegerField(required=False, default=100, min_value=1, help_text="Maximum number of entries")
+
+
 class TrainQLearningModelSerializer(serializers.Serializer):
     start_date = serializers.DateField(required=True, help_text="Start date for training data")
     end_date = serializers.DateField(required=True, help_text="End date for training data")
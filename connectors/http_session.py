@@ -0,0 +1,45 @@
+"""
+Shared HTTP session for the service connectors.
+
+Connectors are created per request, so each one opening its own connections
+would pay a new TCP (and TLS) handshake on every call. They share this
+session instead, which keeps a pool of connections to each service alive.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Number of hosts to keep pools for, and connections kept per host
+POOL_CONNECTIONS = 50
+POOL_MAXSIZE = 50
+
+
+def _create_session():
+    """Create a session with pooled, retrying adapters"""
+    session = requests.Session()
+    # Retry a failed connection attempt only once, so an unreachable service
+    # costs at most two connect timeouts; requests that reached the service
+    # are never repeated
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=Retry(total=3, connect=1, read=False, backoff_factor=0.1)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# Created at import so that connectors used from worker threads share one session
+_session = _create_session()
+
+
+def get_session():
+    """
+    Get the process-wide HTTP session
+
+    Returns:
+        requests.Session: Session with pooled, retrying adapters
+    """
+    return _session
@@ -9,6 +9,8 @@ from django.conf import settings
 from datetime import datetime, date, timedelta
 from django.utils import timezone
 
+from connectors.http_session import get_session
+
 logger = logging.getLogger(__name__)
 
 class OrderServiceConnector:
@@ -35,6 +37,9 @@ class OrderServiceConnector:
         # Connection timeout settings
         self.timeout = 10  # seconds
         
+        # Pooled HTTP session shared with the other connectors
+        self.session = get_session()
+        
         # Flag to use dummy data for testing
         self.use_dummy_data = use_dummy_data
         
@@ -338,7 +343,7 @@ class OrderServiceConnector:
             if has_delivery_date:
                 params['has_delivery_date'] = 'true'
             
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v1/transactions/",
                 params=params,
                 headers=self.headers,
@@ -398,7 +403,7 @@ class OrderServiceConnector:
             if start_date:
                 params['start_date'] = start_date.isoformat()
             
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v1/supplier-performance/",
                 params=params,
                 headers=self.headers,
@@ -456,7 +461,7 @@ class OrderServiceConnector:
             return self.dummy_category_performance.get(supplier_id, {})
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v1/supplier-category-performance/{supplier_id}",
                 headers=self.headers,
                 timeout=self.timeout
@@ -478,7 +483,7 @@ class OrderServiceConnector:
             
         try:
             # Try to connect to the base URL with auth headers for auth-required endpoints
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v1/health-check/",
                 headers=self.headers,
                 timeout=5  # Short timeout for health check
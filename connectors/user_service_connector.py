@@ -7,10 +7,13 @@ import logging
 import os
 import hashlib
 import random
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
 from datetime import datetime, date, timedelta
 from django.utils import timezone
 
+from connectors.http_session import get_session
+
 logger = logging.getLogger(__name__)
 
 class UserServiceConnector:
@@ -33,6 +36,12 @@ class UserServiceConnector:
         # Connection timeout settings
         self.timeout = 10  # seconds
         
+        # Pooled HTTP session shared with the other connectors
+        self.session = get_session()
+        
+        # Upper bound on concurrent requests when fetching suppliers in bulk
+        self.max_bulk_workers = 16
+        
         # Flag to use dummy data for testing
         self.use_dummy_data = use_dummy_data
         
@@ -102,7 +111,7 @@ class UserServiceConnector:
             return self.dummy_suppliers.get(supplier_id, None)
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v1/suppliers/{supplier_id}/",
                 headers=self.headers,
                 timeout=self.timeout
@@ -116,6 +125,31 @@ class UserServiceConnector:
     def get_supplier_by_id(self, supplier_id):
         """Alias for get_supplier"""
         return self.get_supplier(supplier_id)
+
+    def get_suppliers_bulk(self, supplier_ids):
+        """
+        Get several suppliers at once
+
+        Args:
+            supplier_ids (list): IDs of the suppliers
+
+        Returns:
+            dict: Supplier information dictionaries keyed by the requested ID
+        """
+        supplier_ids = list(supplier_ids)
+
+        if self.use_dummy_data:
+            return {supplier_id: self.get_supplier(supplier_id) for supplier_id in supplier_ids}
+
+        if not supplier_ids:
+            return {}
+
+        # The User Service has no bulk endpoint, so overlap the per-supplier
+        # requests instead of paying one round-trip after another
+        max_workers = min(self.max_bulk_workers, len(supplier_ids))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            suppliers = executor.map(self.get_supplier, supplier_ids)
+            return dict(zip(supplier_ids, suppliers))
     
     def get_all_suppliers(self):
         """
@@ -128,7 +162,7 @@ class UserServiceConnector:
             return list(self.dummy_suppliers.values())
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v1/suppliers/",
                 headers=self.headers,
                 timeout=self.timeout
@@ -150,7 +184,7 @@ class UserServiceConnector:
             return [s for s in self.dummy_suppliers.values() if s.get('active', True)]
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v1/suppliers/active/",
                 headers=self.headers,
                 timeout=self.timeout
@@ -180,7 +214,7 @@ class UserServiceConnector:
             return {"compliance_score": supplier.get('compliance_score', 5.0)}
             
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v1/suppliers/{supplier_id}/compliance/",
                 headers=self.headers,
                 timeout=self.timeout
@@ -202,7 +236,7 @@ class UserServiceConnector:
             
         try:
             # Try to connect to the health check endpoint
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/health-check/",
                 headers=self.headers,
                 timeout=5  # Short timeout for health check
@@ -7,6 +7,8 @@ import logging
 import os
 from django.conf import settings
 
+from connectors.http_session import get_session
+
 logger = logging.getLogger(__name__)
 
 class WarehouseServiceConnector:
@@ -33,6 +35,9 @@ class WarehouseServiceConnector:
         # Connection timeout settings
         self.timeout = 10  # seconds
         
+        # Pooled HTTP session shared with the other connectors
+        self.session = get_session()
+        
         # Flag to use dummy data for testing
         self.use_dummy_data = use_dummy_data
         
@@ -157,7 +162,7 @@ class WarehouseServiceConnector:
             return [sp for sp in self.dummy_supplier_products if sp['supplier_id'] == supplier_id]
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v1/supplier-products/",
                 params={"supplier_id": supplier_id},
                 headers=self.headers,
@@ -176,7 +181,7 @@ class WarehouseServiceConnector:
             return [sp for sp in self.dummy_supplier_products if sp['product_id'] == product_id]
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v1/product-suppliers/{product_id}",
                 headers=self.headers,
                 timeout=self.timeout
@@ -187,12 +192,14 @@ class WarehouseServiceConnector:
             logger.error(f"Error fetching suppliers for product {product_id}: {str(e)}")
             return []
     
-    def get_suppliers_by_product(self, product_id):
+    def get_suppliers_by_product(self, product_id, city=None):
         """
         Get suppliers that offer a specific product
         
         Args:
             product_id (int or str): ID of the product
+            city (str, optional): Only return suppliers located in this city.
+                Dummy data has no supplier locations, so it is not filtered.
             
         Returns:
             list: List of supplier IDs
@@ -227,8 +234,9 @@ class WarehouseServiceConnector:
             return all_supplier_ids[:supplier_count]
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v1/products/{product_id}/suppliers/",
+                params={"city": city} if city else None,
                 headers=self.headers,
                 timeout=self.timeout
             )
@@ -245,7 +253,7 @@ class WarehouseServiceConnector:
             return self.dummy_products.get(product_id)
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v1/products/{product_id}",
                 headers=self.headers,
                 timeout=self.timeout
@@ -267,7 +275,7 @@ class WarehouseServiceConnector:
             return suppliers
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v1/suppliers-by-category/{category_id}",
                 headers=self.headers,
                 timeout=self.timeout
@@ -289,7 +297,7 @@ class WarehouseServiceConnector:
             
         try:
             # Try to connect to the base URL with auth headers for auth-required endpoints
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v1/health-check/",
                 headers=self.headers,
                 timeout=5  # Short timeout for health check
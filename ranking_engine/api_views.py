@@ -4,28 +4,161 @@ Supplier Ranking API
 This module provides API endpoints for the Q-Learning based Supplier Ranking Service.
 """
 
-from api.models import RankingEvent
+from api.models import RankingEvent, RankingConfiguration
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from datetime import date
 import logging
 import hashlib
+import threading
+import time
 
 from api.models import QLearningState, QLearningAction, QTableEntry, SupplierRanking
-from ranking_engine.q_learning.agent import SupplierRankingAgent
+from api.serializers import SupplierFeedbackSerializer, SupplierQValueQuerySerializer, QTableQuerySerializer
+from ranking_engine.q_learning.agent import SupplierRankingAgent, get_q_table_size
 from ranking_engine.q_learning.environment import SupplierEnvironment
 from ranking_engine.q_learning.state_mapper import StateMapper
 from ranking_engine.services.metrics_service import MetricsService
 from ranking_engine.services.supplier_service import SupplierService
+from ranking_engine.services.training_service import TrainingService
+from ranking_engine.services.snapshot_service import (
+    get_ranking_snapshot, claim_ranking_snapshot, store_ranking_snapshot
+)
 from connectors.warehouse_service_connector import WarehouseServiceConnector
 from connectors.user_service_connector import UserServiceConnector
 
 logger = logging.getLogger(__name__)
 
+# Per-process service instances shared across requests, so that connector
+# setup and agent configuration loading are not repeated on every call
+_instances = {}
+_instances_lock = threading.Lock()
+
+# Active RankingConfiguration (ID, last update) each shared instance that
+# captures the configuration was built with
+_config_versions = {}
+
+# Seconds the active configuration version is trusted before it is read again
+CONFIG_CHECK_INTERVAL = 30
+_active_config_version = None
+_active_config_checked_at = None
+
+
+def _get_instance(cls):
+    """Return the shared instance of cls, creating it on first use"""
+    instance = _instances.get(cls)
+    if instance is None:
+        with _instances_lock:
+            instance = _instances.get(cls)
+            if instance is None:
+                instance = _instances[cls] = cls()
+    return instance
+
+
+def _get_active_config_version():
+    """
+    Return the active RankingConfiguration's (ID, last update), read again at
+    most every CONFIG_CHECK_INTERVAL seconds. Configuration writes in this
+    process force the next call to read it; edits made through other worker
+    processes apply within the interval.
+    """
+    global _active_config_version, _active_config_checked_at
+    now = time.monotonic()
+    if _active_config_checked_at is None or now - _active_config_checked_at >= CONFIG_CHECK_INTERVAL:
+        _active_config_version = (
+            RankingConfiguration.objects.filter(is_active=True).values_list('id', 'updated_at').first()
+        )
+        _active_config_checked_at = now
+    return _active_config_version
+
+
+@receiver([post_save, post_delete], sender=RankingConfiguration)
+def recheck_active_config(sender, **kwargs):
+    """Read the active configuration version again on the next call."""
+    global _active_config_checked_at
+    _active_config_checked_at = None
+
+
+def _get_configured_instance(cls):
+    """
+    Return the shared instance of a class that captures the active
+    RankingConfiguration, rebuilding it once the configuration has changed.
+    """
+    version = _get_active_config_version()
+    if _config_versions.get(cls) != version:
+        with _instances_lock:
+            if _config_versions.get(cls) != version:
+                _instances.pop(cls, None)
+                _config_versions[cls] = version
+    return _get_instance(cls)
+
+
+def get_agent():
+    return _get_configured_instance(SupplierRankingAgent)
+
+
+def get_environment():
+    return _get_configured_instance(SupplierEnvironment)
+
+
+def get_state_mapper():
+    return _get_instance(StateMapper)
+
+
+def get_supplier_service():
+    return _get_instance(SupplierService)
+
+
+def get_metrics_service():
+    return _get_instance(MetricsService)
+
+
+def get_warehouse_service():
+    return _get_instance(WarehouseServiceConnector)
+
+
+def get_user_service():
+    return _get_instance(UserServiceConnector)
+
+
+def get_training_service():
+    return _get_instance(TrainingService)
+
+
+def reset_agent():
+    """Drop the shared agent and environment so the next request picks up fresh ones"""
+    with _instances_lock:
+        _instances.pop(SupplierRankingAgent, None)
+        _instances.pop(SupplierEnvironment, None)
+
+
+def _on_training_complete():
+    """Called once a training job finishes and the Q-table has changed"""
+    reset_agent()
+
+
+def _company_name(supplier):
+    """Return a supplier's display name from whichever field the User Service provided"""
+    if not supplier:
+        return None
+    name = supplier.get('company_name') or supplier.get('name')
+    if name:
+        return name
+    user = supplier.get('user')
+    if isinstance(user, dict):
+        if user.get('name'):
+            return user['name']
+        if 'first_name' in user and 'last_name' in user:
+            return f"{user['first_name']} {user['last_name']}"
+    return None
+
+
 class FeedbackView(APIView):
     """
     Accept supplier feedback and update Q-values using the Q-learning pipeline
@@ -33,20 +166,17 @@ class FeedbackView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
-        supplier_id = request.data.get("supplier_id")
-        product_id = request.data.get("product_id")
-        city = request.data.get("city")
-
         # Validate input
-        if not supplier_id:
-            return Response(
-                {"error": "supplier_id is required"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        serializer = SupplierFeedbackSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        supplier_id = serializer.validated_data["supplier_id"]
+        product_id = serializer.validated_data["product_id"]
+        city = serializer.validated_data["city"]
 
         # Get supplier details
-        user_service = UserServiceConnector()
-        metrics_service = MetricsService()
+        user_service = get_user_service()
         supplier = user_service.get_supplier(supplier_id)
         if not supplier:
             return Response(
@@ -56,23 +186,30 @@ class FeedbackView(APIView):
 
         try:
             # === Q-Learning Pipeline ===
-            state_mapper = StateMapper()
-            environment = SupplierEnvironment()
-            agent = SupplierRankingAgent()
+            state_mapper = get_state_mapper()
+            environment = get_environment()
 
             # Step 1: Get current state using stored supplier data
             state = state_mapper.get_supplier_state(supplier_id)
 
+            # Nothing to learn if the state has no actions; check this before
+            # the agent is loaded
+            if not environment.get_actions(state):
+                return Response(
+                    {"error": f"No actions available for state {state.name}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
             # Step 2: Agent selects the best action (based on policy)
+            agent = get_agent()
             action = agent.get_best_action(state)
 
-            if action.name not in [a.name for a in environment.get_actions(state)]:
+            if not environment.is_action_available(state, action):
                 return Response(
                     {"error": f"Action {action} not found"},
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-
             # Step 3: Calculate reward
             reward = environment.get_reward(supplier_id, state, action)
 
@@ -100,23 +237,10 @@ class FeedbackView(APIView):
                 }
             )
 
-            company_name = None
-            if supplier:
-                    # Fix the company_name retrieval to handle all possible formats
-                    if 'company_name' in supplier:
-                        company_name = supplier['company_name']
-                    elif 'name' in supplier:
-                        company_name = supplier['name']
-                    elif 'user' in supplier and isinstance(supplier['user'], dict):
-                        if 'name' in supplier['user']:
-                            company_name = supplier['user']['name']
-                        elif 'first_name' in supplier['user'] and 'last_name' in supplier['user']:
-                            company_name = f"{supplier['user']['first_name']} {supplier['user']['last_name']}"    
-
             return Response({
                 "message": "Feedback processed and Q-table updated",
                 "supplier_id": supplier_id,
-                "company_name": company_name or f"Supplier {supplier_id}",  # Provide default
+                "company_name": _company_name(supplier) or f"Supplier {supplier_id}",  # Provide default
                 "state": state.name,
                 "action": action.name,
                 "reward": reward,
@@ -126,7 +250,7 @@ class FeedbackView(APIView):
             })
 
         except Exception as e:
-            logger.error(f"Error processing feedback: {str(e)}")
+            logger.error("Error processing feedback: %s", e, extra={"supplier_id": supplier_id})
             return Response(
                 {"error": "Failed to process feedback"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -143,6 +267,7 @@ class SupplierRankingView(APIView):
     def get(self, request):
         product_id = request.query_params.get('product_id')
         city = request.query_params.get('city')  # Using city instead of region
+        limit = request.query_params.get('limit')
         
         if not product_id:
             return Response(
@@ -150,122 +275,199 @@ class SupplierRankingView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        try:
-            # Get suppliers that offer this product
-            warehouse_service = WarehouseServiceConnector()
-            suppliers = warehouse_service.get_suppliers_by_product(product_id)
-            
-            if not suppliers:
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                limit = 0
+            if limit < 1:
                 return Response(
-                    {"message": f"No suppliers found for product {product_id}"},
-                    status=status.HTTP_200_OK
+                    {"error": "limit must be a positive integer"},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
-            
-            # Get metrics for each supplier
-            metrics_service = MetricsService()
-            user_service = UserServiceConnector()
-            state_mapper = StateMapper()
-            ranked_suppliers = []
-            
-            logger.info(f"Getting rankings for suppliers offering product {product_id} in city {city}")
-            
-            for supplier_id in suppliers:
-                # Get supplier details to check city
-                supplier = user_service.get_supplier(supplier_id)
-                
-                # Skip if supplier is not in the requested city
-                supplier_city = None
-                if supplier:
-                    if 'city' in supplier:
-                        supplier_city = supplier['city']
-                    elif 'user' in supplier and 'city' in supplier['user']:
-                        supplier_city = supplier['user']['city']
-                
-                # Filter by city if provided
-                if city and supplier_city and supplier_city.lower() != city.lower():
-                    continue
-                
-                # Calculate metrics for this supplier
-                metrics = metrics_service.get_supplier_metrics(supplier_id)
-                
-                # Get state for these metrics
-                state = state_mapper.get_supplier_state(supplier_id)
-                
-                # Get Q-values for this state and supplier
-                q_entries = QTableEntry.objects.filter(state=state).order_by('-q_value')
-                print(f"Q-entries found for supplier {state}: {q_entries}")
-                
-                # Get best action and its Q-value
-                best_q_value = 0.0
-                best_action = None
-                
-                if q_entries:
-                    
-                    best_entry = q_entries.first()
-                    best_q_value = best_entry.q_value
-                    best_action = best_entry.action.name
-                
-                # Calculate overall score
-                score = metrics['overall_score']
+        
+        try:
+            # Serve the stored snapshot while it is fresh
+            payload = get_ranking_snapshot(product_id, city)
+            if payload is None:
+                # Claim the snapshot before reading any rankings, so that a
+                # write to them while they are computed discards the result
+                snapshot_id = claim_ranking_snapshot(product_id, city)
+                payload, state_ids = self._compute_rankings(product_id, city)
+                if payload is None:
+                    return Response(
+                        {"message": f"No suppliers found for product {product_id}"},
+                        status=status.HTTP_200_OK
+                    )
                 
-                # Get company name with fallback
-                company_name = None
-                if supplier:
-                    # Fix the company_name retrieval to handle all possible formats
-                    if 'company_name' in supplier:
-                        company_name = supplier['company_name']
-                    elif 'name' in supplier:
-                        company_name = supplier['name']
-                    elif 'user' in supplier and isinstance(supplier['user'], dict):
-                        if 'name' in supplier['user']:
-                            company_name = supplier['user']['name']
-                        elif 'first_name' in supplier['user'] and 'last_name' in supplier['user']:
-                            company_name = f"{supplier['user']['first_name']} {supplier['user']['last_name']}"
-
-                latest_ranking = (
-                    SupplierRanking.objects.filter(supplier_id=supplier_id)
-                    .order_by('-date')
-                    .first()
+                store_ranking_snapshot(
+                    snapshot_id,
+                    payload,
+                    state_ids=state_ids,
+                    supplier_ids=[supplier["supplier_id"] for supplier in payload["suppliers"]]
                 )
-
-                tier = latest_ranking.tier if latest_ranking and latest_ranking.tier else 5
-                score = latest_ranking.overall_score if latest_ranking else score
-                
-                # Use supplier_id to create a slight variation in scores to ensure uniqueness
-                if score:
-                    # Add a small variation (±0.1) based on supplier_id
-                    seed = int(hashlib.md5(str(supplier_id).encode()).hexdigest(), 16) % 1000 / 1000.0
-                    variation = (seed * 2 - 1) * 0.01  # -0.01 to 0.01 range
-                    score = score + variation
-                
-                ranked_suppliers.append({
-                    "supplier_id": supplier_id,
-                    "company_name": company_name or f"Supplier {supplier_id}",  # Provide default
-                    "score": score,
-                    "tier": tier,
-                    "state": state.name,
-                    "best_action": best_action,
-                    "q_value": best_q_value,
-                    "city": supplier_city
-                })
             
-            # Sort by tier (ascending), then score (descending)
-            ranked_suppliers.sort(key=lambda x: (x["tier"], -x["score"]))
-
+            # Snapshots hold the full ranked list, so the top suppliers are a prefix
+            suppliers = payload["suppliers"]
+            if limit:
+                suppliers = suppliers[:limit]
             
+            # Echo the city as requested; snapshots are keyed case-insensitively
             return Response({
-                "product_id": product_id,
+                **payload,
                 "city": city,
-                "suppliers": ranked_suppliers,
-                "count": len(ranked_suppliers)
+                "suppliers": suppliers,
+                "count": len(suppliers),
+                "total_count": payload["count"]
             })
             
         except Exception as e:
-            logger.error(f"Error getting supplier rankings: {str(e)}")
+            logger.error("Error getting supplier rankings: %s", e, extra={"product_id": product_id, "city": city})
             return Response(
                 {"error": f"Failed to get supplier rankings: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+    
+    def _compute_rankings(self, product_id, city):
+        """
+        Rank the suppliers offering a product from their metrics and Q-values
+        
+        Args:
+            product_id (str): ID of the product
+            city (str, optional): City to restrict suppliers to
+            
+        Returns:
+            tuple: Ranking response payload and the IDs of the ranked suppliers'
+                states, or (None, None) if no supplier offers the product
+        """
+        # Get suppliers that offer this product, filtered by city where
+        # the Warehouse Service supports it
+        warehouse_service = get_warehouse_service()
+        suppliers = warehouse_service.get_suppliers_by_product(product_id, city=city)
+        
+        if not suppliers:
+            return None, None
+        
+        # Get metrics for each supplier
+        metrics_service = get_metrics_service()
+        supplier_service = get_supplier_service()
+        state_mapper = get_state_mapper()
+        ranked_suppliers = []
+        
+        logger.info(
+            "Getting rankings for suppliers offering product %s in city %s", product_id, city,
+            extra={"product_id": product_id, "city": city}
+        )
+        
+        # Fetch all supplier details up front instead of one request per supplier
+        suppliers_by_id = supplier_service.get_suppliers_bulk(suppliers)
+        
+        city_filter = city.lower() if city else None
+        candidates = []
+        for supplier_id in suppliers:
+            # Get supplier details to check city
+            supplier = suppliers_by_id.get(supplier_id)
+            
+            # Skip if supplier is not in the requested city
+            supplier_city = None
+            if supplier:
+                if 'city' in supplier:
+                    supplier_city = supplier['city']
+                elif 'user' in supplier and 'city' in supplier['user']:
+                    supplier_city = supplier['user']['city']
+            
+            # Filter by city if provided, in case the Warehouse Service did not
+            if city_filter and supplier_city and supplier_city.lower() != city_filter:
+                continue
+            
+            # Calculate metrics for this supplier
+            metrics = metrics_service.get_supplier_metrics(supplier_id)
+            
+            # Get state for these metrics
+            state = state_mapper.get_supplier_state(supplier_id)
+            
+            candidates.append((supplier_id, supplier, supplier_city, metrics, state))
+        
+        # Get the best action and its Q-value for every state in a single query,
+        # one row per state
+        best_entry_qs = (
+            QTableEntry.objects.filter(state=OuterRef('pk'))
+            .order_by('-q_value', 'id')
+        )
+        best_entries = {
+            row['id']: row
+            for row in QLearningState.objects.filter(
+                id__in={state.id for *_, state in candidates}
+            ).annotate(
+                best_q_value=Subquery(best_entry_qs.values('q_value')[:1]),
+                best_action=Subquery(best_entry_qs.values('action__name')[:1])
+            ).values('id', 'best_q_value', 'best_action')
+        }
+        
+        # Get the latest stored ranking for every supplier in a single query
+        latest_date = (
+            SupplierRanking.objects.filter(supplier_id=OuterRef('supplier_id'))
+            .order_by('-date')
+            .values('date')[:1]
+        )
+        latest_rankings = {
+            str(ranking.supplier_id): ranking
+            for ranking in SupplierRanking.objects.filter(
+                supplier_id__in=[c[0] for c in candidates],
+                date=Subquery(latest_date)
+            )
+        }
+        
+        for supplier_id, supplier, supplier_city, metrics, state in candidates:
+            # Get best action and its Q-value
+            best_q_value = 0.0
+            best_action = None
+            
+            best_entry = best_entries.get(state.id)
+            if best_entry and best_entry['best_action'] is not None:
+                best_q_value = best_entry['best_q_value']
+                best_action = best_entry['best_action']
+            
+            # Calculate overall score
+            score = metrics['overall_score']
+            
+            # Get company name with fallback
+            company_name = _company_name(supplier)
+
+            latest_ranking = latest_rankings.get(str(supplier_id))
+
+            tier = latest_ranking.tier if latest_ranking and latest_ranking.tier else 5
+            score = latest_ranking.overall_score if latest_ranking else score
+            
+            # Use supplier_id to create a slight variation in scores to ensure uniqueness
+            if score:
+                # Add a small variation (±0.1) based on supplier_id
+                seed = int(hashlib.md5(str(supplier_id).encode()).hexdigest(), 16) % 1000 / 1000.0
+                variation = (seed * 2 - 1) * 0.01  # -0.01 to 0.01 range
+                score = score + variation
+            
+            ranked_suppliers.append({
+                "supplier_id": supplier_id,
+                "company_name": company_name or f"Supplier {supplier_id}",  # Provide default
+                "score": score,
+                "tier": tier,
+                "state": state.name,
+                "best_action": best_action,
+                "q_value": best_q_value,
+                "city": supplier_city
+            })
+        
+        # Sort by tier (ascending), then score (descending); the sort is stable,
+        # so ties keep the order the Warehouse Service listed them in
+        ranked_suppliers.sort(key=lambda x: (x["tier"], -x["score"]))
+        
+        payload = {
+            "product_id": product_id,
+            "city": city,
+            "suppliers": ranked_suppliers,
+            "count": len(ranked_suppliers)
+        }
+        return payload, {state.id for *_, state in candidates}
 
 
 class ManualTrainingView(APIView):
@@ -274,29 +476,33 @@ class ManualTrainingView(APIView):
     """
     permission_classes = [AllowAny]
     
-    @transaction.atomic
     def post(self, request):
         try:
-            # Create agent
-            agent = SupplierRankingAgent()
-            
             # Get training parameters
             iterations = int(request.data.get('iterations', 100))
             supplier_ids = request.data.get('supplier_ids', None)
             
-            logger.info(f"Starting manual training with {iterations} iterations")
+            logger.info("Queueing manual training with %d iterations", iterations, extra={"iterations": iterations})
             
-            # Perform batch training
-            agent.batch_train(iterations=iterations, supplier_ids=supplier_ids)
+            # Run batch training in the background; the shared agent and the
+            # stored rankings are dropped once the job finishes
+            training_service = get_training_service()
+            job_id = training_service.start_training(
+                iterations=iterations,
+                supplier_ids=supplier_ids,
+                on_complete=_on_training_complete
+            )
             
             return Response({
-                "message": "Q-table updated with historical data",
+                "message": "Training job queued",
+                "job_id": job_id,
+                "status": "queued",
                 "iterations": iterations,
                 "supplier_count": len(supplier_ids) if supplier_ids else "all"
-            })
+            }, status=status.HTTP_202_ACCEPTED)
         
         except Exception as e:
-            logger.error(f"Error during manual training: {str(e)}")
+            logger.error("Error queueing manual training: %s", e)
             return Response(
                 {"error": f"Training failed: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -310,54 +516,47 @@ class QValueView(APIView):
     permission_classes = [AllowAny]
     
     def get(self, request):
-        supplier_id = request.query_params.get('supplier_id')
+        serializer = SupplierQValueQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        if not supplier_id:
-            return Response(
-                {"error": "supplier_id is required"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        supplier_id = serializer.validated_data['supplier_id']
         
         try:
             # Use metrics service to get metrics for this supplier
-            metrics_service = MetricsService()
+            metrics_service = get_metrics_service()
             metrics = metrics_service.calculate_combined_metrics(supplier_id)
             
             # Map to state
-            state_mapper = StateMapper()
+            state_mapper = get_state_mapper()
             state = state_mapper.get_state_from_metrics(metrics)
             
             # Get available actions
-            environment = SupplierEnvironment()
+            environment = get_environment()
             actions = environment.get_actions(state)
             
-            # Get Q-values for each action
+            # Get Q-values for each action with a single query
+            q_entries = {
+                entry.action_id: entry
+                for entry in QTableEntry.objects.filter(state=state, action__in=actions)
+            }
             q_values = []
             for action in actions:
-                try:
-                    q_entry = QTableEntry.objects.get(state=state, action=action)
-                    q_values.append({
-                        "action": action.name,
-                        "q_value": q_entry.q_value,
-                        "update_count": q_entry.update_count
-                    })
-                except QTableEntry.DoesNotExist:
-                    q_values.append({
-                        "action": action.name,
-                        "q_value": 0.0,
-                        "update_count": 0
-                    })
+                q_entry = q_entries.get(action.id)
+                q_values.append({
+                    "action": action.name,
+                    "q_value": q_entry.q_value if q_entry else 0.0,
+                    "update_count": q_entry.update_count if q_entry else 0
+                })
             
             # Get supplier details
-            supplier_service = SupplierService()
+            supplier_service = get_supplier_service()
             supplier = supplier_service.get_supplier(supplier_id)
             
             # Get company name with fallback
             company_name = None
             if supplier:
-                company_name = supplier.get('company_name', 
-                              supplier.get('name',
-                              supplier.get('user', {}).get('name', f"Unknown Supplier {supplier_id}")))
+                company_name = _company_name(supplier) or f"Unknown Supplier {supplier_id}"
             
             return Response({
                 "state": state.name,
@@ -368,7 +567,7 @@ class QValueView(APIView):
             })
             
         except Exception as e:
-            logger.error(f"Error retrieving Q-values: {str(e)}")
+            logger.error("Error retrieving Q-values: %s", e, extra={"supplier_id": supplier_id})
             return Response(
                 {"error": f"Failed to retrieve Q-values: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -382,12 +581,16 @@ class QTableView(APIView):
     permission_classes = [AllowAny]
     
     def get(self, request):
+        serializer = QTableQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
         try:
             # Support filtering
-            state_name = request.query_params.get('state')
-            action_name = request.query_params.get('action')
-            min_q_value = request.query_params.get('min_q_value')
-            limit = int(request.query_params.get('limit', 100))
+            state_name = serializer.validated_data['state']
+            action_name = serializer.validated_data['action']
+            min_q_value = serializer.validated_data['min_q_value']
+            limit = serializer.validated_data['limit']
             
             # Start with all entries
             entries_query = QTableEntry.objects.all()
@@ -399,33 +602,36 @@ class QTableView(APIView):
             if action_name:
                 entries_query = entries_query.filter(action__name__contains=action_name)
             
-            if min_q_value:
-                entries_query = entries_query.filter(q_value__gte=float(min_q_value))
+            if min_q_value is not None:
+                entries_query = entries_query.filter(q_value__gte=min_q_value)
             
             # Limit the result count
             entries_query = entries_query.order_by('-q_value')[:limit]
             
-            # Get the entries
-            entries = entries_query.select_related('state', 'action')
+            # Fetch only the columns needed for the response, joined in the same query
+            entries = entries_query.values(
+                'state__name', 'action__name', 'q_value', 'update_count'
+            )
             
             # Format for response
-            q_table = []
-            for entry in entries:
-                q_table.append({
-                    "state": entry.state.name,
-                    "action": entry.action.name,
-                    "q_value": entry.q_value,
-                    "update_count": entry.update_count
-                })
+            q_table = [
+                {
+                    "state": entry['state__name'],
+                    "action": entry['action__name'],
+                    "q_value": entry['q_value'],
+                    "update_count": entry['update_count']
+                }
+                for entry in entries
+            ]
             
             return Response({
                 "q_table_entries": q_table,
                 "count": len(q_table),
-                "total_entries": QTableEntry.objects.count()
+                "total_entries": get_q_table_size()
             })
             
         except Exception as e:
-            logger.error(f"Error retrieving Q-table: {str(e)}")
+            logger.error("Error retrieving Q-table: %s", e)
             return Response(
                 {"error": f"Failed to retrieve Q-table: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
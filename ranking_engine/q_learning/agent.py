@@ -15,6 +15,11 @@ from connectors.group30_connector import Group30Connector
 from connectors.group32_connector import Group32Connector
 from ranking_engine.services.supplier_service import SupplierService
 from ranking_engine.services.metrics_service import MetricsService
+from ranking_engine.services.snapshot_service import invalidate_ranking_snapshots
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 import random
 import secrets
 import numpy as np
@@ -22,6 +27,19 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Cached number of Q-table entries, refreshed at most every
+# Q_TABLE_SIZE_CACHE_TIMEOUT seconds or when the agent adds entries
+Q_TABLE_SIZE_CACHE_KEY = 'qtable:total'
+Q_TABLE_SIZE_CACHE_TIMEOUT = 30
+
+# Number of states whose trained Q-values are written back per transaction
+TRAINING_WRITE_CHUNK_STATES = 500
+
+
+def get_q_table_size():
+    """Return the total number of Q-table entries, served from the cache when possible."""
+    return cache.get_or_set(Q_TABLE_SIZE_CACHE_KEY, QTableEntry.objects.count, Q_TABLE_SIZE_CACHE_TIMEOUT)
+
 
 class SupplierRankingAgent:
     """
@@ -88,7 +106,7 @@ class SupplierRankingAgent:
         # Exploration: random action      
         if exploration and self.should_explore():
             action = secrets.choice(available_actions)
-            print(f"🔀 [Exploration] Selected random action: {action.name}")
+            logger.debug("Exploration selected random action %s", action.name)
             return action
         
         # Exploitation: best action based on Q-values
@@ -127,7 +145,7 @@ class SupplierRankingAgent:
             float: Updated Q-value
         """
         # Get current Q-value
-        q_entry, created = QTableEntry.objects.get_or_create(
+        q_entry, created_any = QTableEntry.objects.get_or_create(
             state=state,
             action=action,
             defaults={'q_value': 0.0}
@@ -145,6 +163,7 @@ class SupplierRankingAgent:
                 defaults={'q_value': 0.0}
             )
             next_q_values.append(next_q_entry.q_value)
+            created_any = created_any or created
         
         max_next_q = max(next_q_values) if next_q_values else 0.0
         
@@ -158,6 +177,9 @@ class SupplierRankingAgent:
         q_entry.update_count += 1
         q_entry.save()
         
+        if created_any:
+            cache.delete(Q_TABLE_SIZE_CACHE_KEY)
+        
         return new_q
     
     def rank_supplier(self, supplier_id, update_ranking=True, exploration=True):
@@ -210,6 +232,12 @@ class SupplierRankingAgent:
         """
         Train the agent on a batch of suppliers.
         
+        The Q-table for the suppliers' states is loaded into a NumPy array once,
+        every iteration applies the Q-learning update for all suppliers at once,
+        and the result is written back in bulk. A supplier's next state is its
+        current state, as in SupplierEnvironment.next_state, so states and
+        rewards are resolved once up front.
+        
         Args:
             iterations (int): Number of training iterations
             supplier_ids (list, optional): List of supplier IDs to train on
@@ -225,9 +253,152 @@ class SupplierRankingAgent:
                 elif 'user' in supplier and 'id' in supplier['user']:
                     supplier_ids.append(supplier['user']['id'])
         
+        # Resolve the state of every supplier once
+        states = []
+        state_index = {}
+        state_suppliers = []
+        supplier_state_idx = []
+        for supplier_id in supplier_ids:
+            if not self.supplier_service.get_supplier(supplier_id):
+                logger.error(f"Supplier with ID {supplier_id} does not exist or could not be fetched")
+                continue
+            
+            state = self.environment.get_state(supplier_id)
+            if state.id not in state_index:
+                state_index[state.id] = len(states)
+                states.append(state)
+                state_suppliers.append(supplier_id)
+            supplier_state_idx.append(state_index[state.id])
+        
+        if not states:
+            return
+        
+        # Collect the actions available in any of these states
+        actions = []
+        action_index = {}
+        available = []
+        for state in states:
+            state_actions = self.environment.get_actions(state)
+            for action in state_actions:
+                if action.id not in action_index:
+                    action_index[action.id] = len(actions)
+                    actions.append(action)
+            available.append([action_index[action.id] for action in state_actions])
+        
+        n_states, n_actions = len(states), len(actions)
+        mask = np.zeros((n_states, n_actions), dtype=bool)
+        for s, action_idxs in enumerate(available):
+            mask[s, action_idxs] = True
+        
+        # Rewards only depend on the state and the action
+        rewards = np.zeros((n_states, n_actions))
+        for s, state in enumerate(states):
+            for a in available[s]:
+                rewards[s, a] = self.environment.get_reward(state_suppliers[s], state, actions[a])
+        
+        # Load the current Q-values
+        q_table = np.zeros((n_states, n_actions))
+        stored = np.zeros((n_states, n_actions), dtype=bool)
+        for entry in QTableEntry.objects.filter(state__in=states, action__in=actions):
+            s, a = state_index[entry.state_id], action_index[entry.action_id]
+            q_table[s, a] = entry.q_value
+            stored[s, a] = True
+        initial_q_table = q_table.copy()
+        
+        # Suppliers in states without any actions cannot be trained
+        has_actions = mask.any(axis=1)
+        s_idx = np.array(supplier_state_idx)
+        s_idx = s_idx[has_actions[s_idx]]
+        if not s_idx.size:
+            return
+        
+        update_counts = np.zeros((n_states, n_actions), dtype=np.int64)
+        rng = np.random.default_rng()
+        
         for _ in range(iterations):
-            for supplier_id in supplier_ids:
-                self.rank_supplier(supplier_id, update_ranking=False, exploration=True)
+            # Epsilon-greedy action per supplier, breaking ties randomly
+            masked_q = np.where(mask, q_table, -np.inf)
+            q_values = masked_q[s_idx]
+            best = q_values == q_values.max(axis=1, keepdims=True)
+            greedy_actions = (rng.random(best.shape) * best).argmax(axis=1)
+            random_actions = (rng.random(best.shape) * mask[s_idx]).argmax(axis=1)
+            explore = rng.random(len(s_idx)) < self.exploration_rate
+            a_idx = np.where(explore, random_actions, greedy_actions)
+            
+            # Suppliers sharing a state and action hit the same Q-value; with the
+            # target fixed for the iteration, k successive updates collapse to
+            # Q + (1 - (1 - alpha)^k) * (target - Q)
+            hits = np.zeros((n_states, n_actions), dtype=np.int64)
+            np.add.at(hits, (s_idx, a_idx), 1)
+            
+            max_next_q = np.where(has_actions, masked_q.max(axis=1), 0.0)
+            target = rewards + self.discount_factor * max_next_q[:, np.newaxis]
+            step = 1 - (1 - self.learning_rate) ** hits
+            q_table += step * (target - q_table)
+            update_counts += hits
+        
+        # Write back how much each Q-value changed rather than its trained
+        # value, so that feedback learned while training ran is kept
+        self._apply_trained_q_values(
+            states, actions, q_table - initial_q_table, update_counts, stored
+        )
+    
+    def _apply_trained_q_values(self, states, actions, q_deltas, update_counts, stored):
+        """
+        Add the Q-value changes of a training run to the stored Q-table.
+        
+        Entries are re-read under a row lock and updated in chunks of states,
+        each committed on its own, so writes made since training loaded the
+        Q-table are not lost.
+        
+        Args:
+            states (list): States indexing the first axis of the arrays
+            actions (list): Actions indexing the second axis of the arrays
+            q_deltas (numpy.ndarray): Change of each Q-value during training
+            update_counts (numpy.ndarray): Number of updates of each Q-value
+            stored (numpy.ndarray): Whether each entry existed when training started
+        """
+        state_index = {state.id: s for s, state in enumerate(states)}
+        action_index = {action.id: a for a, action in enumerate(actions)}
+        trained_states = np.unique(np.nonzero(update_counts)[0])
+        created_any = False
+        
+        for start in range(0, len(trained_states), TRAINING_WRITE_CHUNK_STATES):
+            chunk = trained_states[start:start + TRAINING_WRITE_CHUNK_STATES]
+            chunk_states = [states[s] for s in chunk]
+            now = timezone.now()
+            
+            with transaction.atomic():
+                # Create the entries training added, unless feedback has already
+                # created them, so that every trained entry can be locked below
+                missing = [
+                    QTableEntry(state=states[s], action=actions[a], q_value=0.0, update_count=0)
+                    for s in chunk
+                    for a in np.nonzero((update_counts[s] > 0) & ~stored[s])[0]
+                ]
+                if missing:
+                    QTableEntry.objects.bulk_create(missing, ignore_conflicts=True)
+                    created_any = True
+                
+                to_update = []
+                for entry in QTableEntry.objects.select_for_update().filter(
+                    state__in=chunk_states, action__in=actions
+                ):
+                    s, a = state_index[entry.state_id], action_index[entry.action_id]
+                    if not update_counts[s, a]:
+                        continue
+                    entry.q_value += float(q_deltas[s, a])
+                    entry.update_count = F('update_count') + int(update_counts[s, a])
+                    entry.last_updated = now
+                    to_update.append(entry)
+                
+                QTableEntry.objects.bulk_update(to_update, ['q_value', 'update_count', 'last_updated'])
+            
+            # Bulk writes do not send the signals that invalidate stored rankings
+            invalidate_ranking_snapshots(state_ids=[state.id for state in chunk_states])
+        
+        if created_any:
+            cache.delete(Q_TABLE_SIZE_CACHE_KEY)
     
     def get_q_table(self, supplier_id=None):
         """
@@ -305,6 +476,7 @@ class SupplierRankingAgent:
     def reset_q_table(self):
         """Reset the Q-table to initial values."""
         QTableEntry.objects.all().update(q_value=0.0, update_count=0)
+        invalidate_ranking_snapshots()
     
     def get_best_action(self, state):
         """
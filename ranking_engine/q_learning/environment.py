@@ -10,8 +10,9 @@ from api.models import (
     SupplierRanking, SupplierPerformanceCache, RankingEvent
 )
 from django.db.models import Avg, Max, Min
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from datetime import datetime, timedelta, date
-import numpy as np
 from ranking_engine.q_learning.state_mapper import StateMapper
 from connectors.group29_connector import Group29Connector
 from connectors.group30_connector import Group30Connector
@@ -23,6 +24,19 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Available actions per state, keyed by state ID. Actions are structural and
+# only change through writes to the action or state tables, which clear these.
+_actions_by_state = {}
+_action_names_by_state = {}
+
+
+@receiver([post_save, post_delete], sender=QLearningAction)
+@receiver(post_delete, sender=QLearningState)
+def clear_actions_cache(sender=None, **kwargs):
+    """Forget the cached actions of every state."""
+    _actions_by_state.clear()
+    _action_names_by_state.clear()
+
 
 class SupplierEnvironment:
     """
@@ -238,9 +252,30 @@ class SupplierEnvironment:
         Returns:
             list: List of available actions
         """
-        # For now, return all actions
-        # In a more complex implementation, actions could be state-dependent
-        return list(QLearningAction.objects.all())
+        actions = _actions_by_state.get(state.id)
+        if actions is None:
+            # For now, return all actions
+            # In a more complex implementation, actions could be state-dependent
+            actions = tuple(QLearningAction.objects.all())
+            _actions_by_state[state.id] = actions
+        return list(actions)
+    
+    def is_action_available(self, state, action):
+        """
+        Check whether an action is available in a given state.
+        
+        Args:
+            state (QLearningState): Current state
+            action (QLearningAction): Action to check
+            
+        Returns:
+            bool: True if the action can be taken in the state
+        """
+        action_names = _action_names_by_state.get(state.id)
+        if action_names is None:
+            action_names = frozenset(a.name for a in self.get_actions(state))
+            _action_names_by_state[state.id] = action_names
+        return action.name in action_names
     
     def get_reward(self, supplier_id, state, action):
         """
@@ -263,7 +298,8 @@ class SupplierEnvironment:
             service_level = int(state_parts[3][1])
 
             # Calculate average level across dimensions
-            avg_level = (quality_level + delivery_level + price_level + service_level) / 4
+            levels = (quality_level, delivery_level, price_level, service_level)
+            avg_level = sum(levels) / 4
 
             # Initialize reward adjustment
             adjustment = 0.0
@@ -284,7 +320,7 @@ class SupplierEnvironment:
                 adjustment += 3.0 if avg_level <= 2.5 else -3.0
 
             elif action.name == 'FLAG_FOR_AUDIT':
-                variance = np.var([quality_level, delivery_level, price_level, service_level])
+                variance = sum((level - avg_level) ** 2 for level in levels) / 4
                 adjustment += 2.0 if variance >= 1.5 or avg_level <= 2.0 else -1.0
 
             elif action.name == 'REQUEST_QUALITY_IMPROVEMENT':
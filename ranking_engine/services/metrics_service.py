@@ -7,7 +7,6 @@ supplier performance, which will feed into the Q-Learning ranking system.
 
 from django.utils import timezone
 from datetime import date, timedelta
-import numpy as np
 
 from api.models import (
     SupplierPerformanceCache,
@@ -266,7 +265,7 @@ class MetricsService:
         
         # Calculate overall price score
         calculated_price_score = (
-            np.mean(product_price_scores) if product_price_scores else 5.0
+            sum(product_price_scores) / len(product_price_scores) if product_price_scores else 5.0
         )
 
         
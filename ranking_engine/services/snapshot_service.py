@@ -0,0 +1,125 @@
+"""
+Snapshot Service - Stores computed supplier rankings per product and city
+
+Ranking a product's suppliers is expensive, so the ranking endpoint serves a
+stored snapshot until it expires or the data behind it changes. Each snapshot
+records the states and suppliers it was built from, and writes to the Q-table
+or to supplier rankings drop only the snapshots that include them.
+
+A snapshot row is claimed before its rankings are computed and filled in
+afterwards. Invalidation always drops claimed rows that are not filled in yet,
+so a ranking computed from data that changed meanwhile is never stored.
+"""
+
+from datetime import timedelta
+import logging
+
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from api.models import QTableEntry, SupplierRanking, RankingSnapshot
+
+logger = logging.getLogger(__name__)
+
+# How long a stored ranking snapshot is served before it is recomputed
+RANKING_SNAPSHOT_TTL = timedelta(seconds=300)
+
+
+def get_ranking_snapshot(product_id, city):
+    """
+    Get the stored ranking payload for a product and city while it is fresh
+
+    Args:
+        product_id (str): ID of the product
+        city (str, optional): City filter as requested
+
+    Returns:
+        dict: Ranking response payload, or None if there is no fresh snapshot
+    """
+    snapshot = RankingSnapshot.objects.filter(
+        product_id=product_id,
+        city=_snapshot_city(city),
+        payload__isnull=False,
+        computed_at__gte=timezone.now() - RANKING_SNAPSHOT_TTL
+    ).only('payload').first()
+    return snapshot.payload if snapshot else None
+
+
+def claim_ranking_snapshot(product_id, city):
+    """
+    Claim the snapshot row for a product and city before computing its rankings
+
+    Args:
+        product_id (str): ID of the product
+        city (str, optional): City filter as requested
+
+    Returns:
+        int: ID of the claimed snapshot row
+    """
+    snapshot, _ = RankingSnapshot.objects.update_or_create(
+        product_id=product_id,
+        city=_snapshot_city(city),
+        defaults={'payload': None, 'state_ids': [], 'supplier_ids': []}
+    )
+    return snapshot.id
+
+
+def store_ranking_snapshot(snapshot_id, payload, state_ids, supplier_ids):
+    """
+    Fill in a claimed snapshot row, unless it was invalidated since the claim
+
+    Args:
+        snapshot_id (int): ID returned by claim_ranking_snapshot
+        payload (dict): Ranking response payload
+        state_ids (iterable): IDs of the states the rankings were built from
+        supplier_ids (iterable): IDs of the ranked suppliers
+
+    Returns:
+        bool: True if the snapshot was stored
+    """
+    return bool(RankingSnapshot.objects.filter(id=snapshot_id).update(
+        payload=payload,
+        state_ids=sorted(set(state_ids)),
+        supplier_ids=sorted({str(supplier_id) for supplier_id in supplier_ids})
+    ))
+
+
+def invalidate_ranking_snapshots(state_ids=None, supplier_ids=None):
+    """
+    Drop the stored snapshots built from any of the given states or suppliers
+
+    Snapshots still being computed are always dropped. With no arguments every
+    snapshot is dropped.
+
+    Args:
+        state_ids (iterable, optional): IDs of states whose Q-values changed
+        supplier_ids (iterable, optional): IDs of suppliers whose rankings changed
+    """
+    snapshots = RankingSnapshot.objects.all()
+    if state_ids is not None or supplier_ids is not None:
+        affected = Q(payload__isnull=True)
+        for state_id in state_ids or ():
+            affected |= Q(state_ids__contains=[state_id])
+        for supplier_id in supplier_ids or ():
+            affected |= Q(supplier_ids__contains=[str(supplier_id)])
+        snapshots = snapshots.filter(affected)
+    snapshots.delete()
+
+
+@receiver([post_save, post_delete], sender=QTableEntry)
+def invalidate_for_q_table_entry(sender, instance, **kwargs):
+    """Drop the snapshots that include the state of a changed Q-table entry."""
+    invalidate_ranking_snapshots(state_ids=[instance.state_id])
+
+
+@receiver([post_save, post_delete], sender=SupplierRanking)
+def invalidate_for_supplier_ranking(sender, instance, **kwargs):
+    """Drop the snapshots that include the supplier of a changed ranking."""
+    invalidate_ranking_snapshots(supplier_ids=[instance.supplier_id])
+
+
+def _snapshot_city(city):
+    """Snapshots are keyed by the lower-cased city, empty for all cities"""
+    return city.lower() if city else ""
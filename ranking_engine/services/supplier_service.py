@@ -64,7 +64,17 @@ class SupplierService:
         except Exception as e:
             logger.error(f"Error retrieving supplier {supplier_id}: {str(e)}")
             return None
-    
+
+    def get_suppliers_bulk(self, supplier_ids):
+        """
+        Returns several suppliers from User Service in one call, keyed by supplier ID
+        """
+        try:
+            return self.user_service.get_suppliers_bulk(supplier_ids)
+        except Exception as e:
+            logger.error(f"Error retrieving suppliers {supplier_ids}: {str(e)}")
+            return {}
+
     def get_supplier_info(self, supplier_id):
         """
         Returns detailed supplier information from User Service
@@ -0,0 +1,107 @@
+"""
+Training Service - Runs Q-table training jobs in the background
+
+Training can take many iterations over every supplier, so it is run outside
+the request/response cycle. Jobs are queued on a single worker thread and their
+progress is recorded as RankingEvents tagged with the job ID. With the
+TRAINING_JOBS_INLINE setting on, jobs run in the calling thread instead, so
+that their database writes share its connection and transaction (as in tests).
+
+Limitations:
+    - The queue is per process. Under several server workers, jobs queued
+      through different workers run at the same time. Each job adds its
+      Q-value changes to the stored values under row locks, so their
+      updates are combined rather than lost.
+    - Jobs are held in memory. Jobs that are queued or running when the
+      process stops are lost, and their RANKING_STARTED event is never
+      followed by a MODEL_TRAINED or ERROR event.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import uuid
+
+from django.conf import settings
+from django.db import connection
+
+from api.models import RankingEvent
+from ranking_engine.q_learning.agent import SupplierRankingAgent
+
+logger = logging.getLogger(__name__)
+
+
+class TrainingService:
+    """Service for queueing Q-table training jobs"""
+
+    _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='q-table-training')
+
+    def start_training(self, iterations=100, supplier_ids=None, on_complete=None):
+        """
+        Queues a batch training run and returns its job ID
+
+        Args:
+            iterations (int): Number of training iterations
+            supplier_ids (list, optional): List of supplier IDs to train on
+            on_complete (callable, optional): Called after a successful run
+
+        Returns:
+            str: ID of the queued job
+        """
+        job_id = uuid.uuid4().hex
+
+        RankingEvent.objects.create(
+            event_type='RANKING_STARTED',
+            description=f"Training job {job_id} queued",
+            metadata={
+                'job_id': job_id,
+                'iterations': iterations,
+                'supplier_ids': supplier_ids
+            }
+        )
+
+        if getattr(settings, 'TRAINING_JOBS_INLINE', False):
+            self._run_training(job_id, iterations, supplier_ids, on_complete)
+        else:
+            self._executor.submit(self._run_queued_training, job_id, iterations, supplier_ids, on_complete)
+        return job_id
+
+    @classmethod
+    def _run_queued_training(cls, *args):
+        """
+        Runs a queued training job on the worker thread
+        """
+        try:
+            cls._run_training(*args)
+        finally:
+            # The worker thread holds its own database connection
+            connection.close()
+
+    @staticmethod
+    def _run_training(job_id, iterations, supplier_ids, on_complete):
+        """
+        Runs a training job and records its outcome
+        """
+        try:
+            logger.info(
+                "Starting training job %s with %d iterations", job_id, iterations,
+                extra={"job_id": job_id, "iterations": iterations}
+            )
+
+            agent = SupplierRankingAgent()
+            agent.batch_train(iterations=iterations, supplier_ids=supplier_ids)
+
+            if on_complete:
+                on_complete()
+
+            RankingEvent.objects.create(
+                event_type='MODEL_TRAINED',
+                description=f"Training job {job_id} completed",
+                metadata={'job_id': job_id, 'iterations': iterations}
+            )
+        except Exception as e:
+            logger.error("Error during training job %s: %s", job_id, e, extra={"job_id": job_id})
+            RankingEvent.objects.create(
+                event_type='ERROR',
+                description=f"Training job {job_id} failed: {str(e)}",
+                metadata={'job_id': job_id, 'error': str(e)}
+            )
@@ -1,13 +1,25 @@
 import json
-from django.test import TestCase, Client
+from django.http import QueryDict
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
-from api.models import QLearningState, QLearningAction, QTableEntry
+from django.utils import timezone
+from datetime import timedelta
+from api.models import QLearningState, QLearningAction, QTableEntry, RankingSnapshot, RankingConfiguration
 from rest_framework.test import APIClient
 from django.contrib.auth.models import User
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 from rest_framework import status
+from api.serializers import SupplierFeedbackSerializer
+from ranking_engine import api_views
+from ranking_engine.q_learning.agent import SupplierRankingAgent
+from ranking_engine.services.snapshot_service import (
+    RANKING_SNAPSHOT_TTL, claim_ranking_snapshot, store_ranking_snapshot
+)
 
 
+# Training jobs must not run on the worker thread, whose own database
+# connection would commit rows outside the test transaction
+@override_settings(TRAINING_JOBS_INLINE=True)
 class APIEndpointsTestCase(TestCase):
     """Test case for the supplier ranking API endpoints"""
     
@@ -45,8 +57,12 @@ class APIEndpointsTestCase(TestCase):
         self.qvalue_url = '/api/ranking/qvalue/'
         self.qtable_url = '/api/ranking/qtable/'
     
-    def test_endpoint_registration(self):
+    @patch('ranking_engine.services.training_service.TrainingService.start_training')
+    def test_endpoint_registration(self, mock_start_training):
         """Simple test to check if the basic endpoints are registered and reachable"""
+        # Don't start a real training job
+        mock_start_training.return_value = 'test-job'
+        
         # Create a vanilla Django test client
         client = Client()
         
@@ -176,13 +192,11 @@ class APIEndpointsTestCase(TestCase):
         # For now, just check that the URL exists (not 404)
         self.assertNotEqual(response.status_code, 404, "Ranking suppliers URL not found")
     
-    @patch('ranking_engine.q_learning.agent.SupplierRankingAgent')
-    def test_manual_training_endpoint(self, mock_agent):
+    @patch('ranking_engine.services.training_service.TrainingService.start_training')
+    def test_manual_training_endpoint(self, mock_start_training):
         """Test the manual training endpoint"""
-        # Create a mock agent that returns None for batch_train
-        mock_agent_instance = MagicMock()
-        mock_agent_instance.batch_train.return_value = None
-        mock_agent.return_value = mock_agent_instance
+        # Don't start a real background training job
+        mock_start_training.return_value = 'test-job'
         
         # Login as admin
         self.client.force_authenticate(user=self.admin_user)
@@ -190,8 +204,10 @@ class APIEndpointsTestCase(TestCase):
         # Make request
         response = self.client.post(self.train_manual_url, {'iterations': 50}, format='json')
         
-        # For now, just check that the URL exists (not 404)
-        self.assertNotEqual(response.status_code, 404, "Manual training URL not found")
+        # Training is queued rather than run in the request
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['job_id'], 'test-job')
+        self.assertEqual(response.data['status'], 'queued')
     
     @patch('ranking_engine.services.metrics_service.MetricsService')
     @patch('ranking_engine.services.supplier_service.SupplierService')
@@ -253,4 +269,223 @@ class APIEndpointsTestCase(TestCase):
         response = self.client.get(self.qtable_url, format='json')
         
         # For now, just check that the URL exists (not 404)
-        self.assertNotEqual(response.status_code, 404, "Q-table URL not found") 
\ No newline at end of file
+        self.assertNotEqual(response.status_code, 404, "Q-table URL not found")
+    
+    def _create_snapshot(self, product_id, state, supplier_id='123'):
+        """Store a ranking snapshot for a product built from one supplier in one state"""
+        return RankingSnapshot.objects.create(
+            product_id=product_id,
+            city='colombo',
+            payload={
+                "product_id": product_id,
+                "city": "colombo",
+                "suppliers": [{"supplier_id": supplier_id, "state": state.name}],
+                "count": 1
+            },
+            state_ids=[state.id],
+            supplier_ids=[supplier_id]
+        )
+    
+    def test_ranking_snapshot_hit(self):
+        """A fresh snapshot is served with a single query"""
+        self._create_snapshot('456', self.quality_state)
+        
+        with self.assertNumQueries(1):
+            response = self.client.get(f"{self.ranking_suppliers_url}?product_id=456&city=Colombo", format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['city'], 'Colombo')
+        self.assertEqual(response.data['suppliers'][0]['supplier_id'], '123')
+    
+    @patch('ranking_engine.api_views.SupplierRankingView._compute_rankings')
+    def test_ranking_snapshot_expires(self, mock_compute_rankings):
+        """A snapshot older than the TTL is recomputed and replaced"""
+        self._create_snapshot('456', self.quality_state)
+        RankingSnapshot.objects.update(computed_at=timezone.now() - RANKING_SNAPSHOT_TTL - timedelta(seconds=1))
+        
+        payload = {
+            "product_id": "456",
+            "city": "Colombo",
+            "suppliers": [{"supplier_id": "789", "state": self.next_state.name}],
+            "count": 1
+        }
+        mock_compute_rankings.return_value = (payload, {self.next_state.id})
+        
+        response = self.client.get(f"{self.ranking_suppliers_url}?product_id=456&city=Colombo", format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_compute_rankings.assert_called_once_with('456', 'Colombo')
+        self.assertEqual(response.data['suppliers'][0]['supplier_id'], '789')
+        
+        snapshot = RankingSnapshot.objects.get(product_id='456', city='colombo')
+        self.assertEqual(snapshot.payload, payload)
+        self.assertEqual(snapshot.state_ids, [self.next_state.id])
+        self.assertEqual(snapshot.supplier_ids, ['789'])
+    
+    @patch('ranking_engine.api_views.get_agent')
+    @patch('ranking_engine.api_views.get_environment')
+    @patch('ranking_engine.api_views.get_state_mapper')
+    @patch('ranking_engine.api_views.get_user_service')
+    def test_feedback_invalidates_ranking_snapshots(self, mock_user_service, mock_state_mapper,
+                                                   mock_environment, mock_agent):
+        """Feedback drops the snapshots built from the updated state and keeps the others"""
+        self._create_snapshot('456', self.quality_state)
+        self._create_snapshot('789', self.next_state, supplier_id='456')
+        
+        mock_user_service.return_value.get_supplier.return_value = {'id': '123', 'company_name': 'Test Supplier'}
+        mock_state_mapper.return_value.get_supplier_state.return_value = self.quality_state
+        
+        environment = mock_environment.return_value
+        environment.get_actions.return_value = [self.rank_action]
+        environment.is_action_available.return_value = True
+        environment.get_reward.return_value = 1.0
+        environment.next_state.return_value = self.quality_state
+        
+        # Use a real agent so the Q-table is written as in production
+        agent = SupplierRankingAgent()
+        agent.environment = environment
+        mock_agent.return_value = agent
+        
+        response = self.client.post(self.feedback_url, {'supplier_id': 123}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(RankingSnapshot.objects.filter(product_id='456').exists())
+        self.assertTrue(RankingSnapshot.objects.filter(product_id='789').exists())
+    
+    def test_ranking_snapshot_not_stored_after_invalidation(self):
+        """Rankings computed while the Q-table changed are not stored"""
+        snapshot_id = claim_ranking_snapshot('456', 'Colombo')
+        
+        # Q-table write between reading the rankings and storing them
+        self.q_entry.q_value = 0.9
+        self.q_entry.save()
+        
+        stored = store_ranking_snapshot(snapshot_id, {"suppliers": [], "count": 0}, [], [])
+        
+        self.assertFalse(stored)
+        self.assertFalse(RankingSnapshot.objects.exists())
+    
+    def test_config_change_rebuilds_shared_agent(self):
+        """Editing the active configuration replaces the shared agent and environment"""
+        def clear_shared_instances():
+            api_views._instances.clear()
+            api_views._config_versions.clear()
+            api_views.recheck_active_config(RankingConfiguration)
+        
+        clear_shared_instances()
+        self.addCleanup(clear_shared_instances)
+        config = RankingConfiguration.objects.create(name="Shared Config", learning_rate=0.1, is_active=True)
+        
+        agent = api_views.get_agent()
+        environment = api_views.get_environment()
+        
+        # The configuration version is not read again while it is trusted
+        with self.assertNumQueries(0):
+            self.assertIs(api_views.get_agent(), agent)
+            self.assertIs(api_views.get_environment(), environment)
+        
+        config.learning_rate = 0.5
+        config.save()
+        
+        self.assertIsNot(api_views.get_agent(), agent)
+        self.assertEqual(api_views.get_agent().learning_rate, 0.5)
+        self.assertIsNot(api_views.get_environment(), environment)
+    
+    def test_feedback_invalid_supplier_id(self):
+        """Feedback without an integer supplier_id is rejected with field errors"""
+        response = self.client.post(self.feedback_url, {'product_id': '456'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('supplier_id', response.data)
+        
+        response = self.client.post(self.feedback_url, {'supplier_id': 'abc'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('supplier_id', response.data)
+    
+    def test_feedback_product_id_keeps_its_type(self):
+        """The product ID is passed through with the type it was sent with"""
+        serializer = SupplierFeedbackSerializer(data={'supplier_id': '123', 'product_id': 5})
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data['supplier_id'], 123)
+        self.assertEqual(serializer.validated_data['product_id'], 5)
+        
+        serializer = SupplierFeedbackSerializer(data={'supplier_id': 123, 'product_id': '456'})
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data['product_id'], '456')
+        
+        # Form-encoded bodies carry strings, which are kept as they are
+        for body, product_id in (
+            ('supplier_id=1&product_id=SKU-1', 'SKU-1'),
+            ('supplier_id=1&product_id=456', '456'),
+            ('supplier_id=1&product_id=', None),
+        ):
+            serializer = SupplierFeedbackSerializer(data=QueryDict(body))
+            self.assertTrue(serializer.is_valid(), body)
+            self.assertEqual(serializer.validated_data['product_id'], product_id, body)
+    
+    def test_qvalue_invalid_supplier_id(self):
+        """Q-value lookups without an integer supplier_id are rejected with field errors"""
+        response = self.client.get(self.qvalue_url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('supplier_id', response.data)
+        
+        response = self.client.get(f"{self.qvalue_url}?supplier_id=abc", format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('supplier_id', response.data)
+    
+    def test_ranking_limit(self):
+        """limit returns the top suppliers of the ranked list and total_count all of them"""
+        suppliers = [
+            {"supplier_id": supplier_id, "state": self.quality_state.name}
+            for supplier_id in ('123', '456', '789')
+        ]
+        RankingSnapshot.objects.create(
+            product_id='456',
+            city='',
+            payload={"product_id": "456", "city": None, "suppliers": suppliers, "count": 3},
+            state_ids=[self.quality_state.id],
+            supplier_ids=['123', '456', '789']
+        )
+        
+        response = self.client.get(f"{self.ranking_suppliers_url}?product_id=456&limit=2", format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['suppliers'], suppliers[:2])
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(response.data['total_count'], 3)
+        
+        response = self.client.get(f"{self.ranking_suppliers_url}?product_id=456", format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['suppliers'], suppliers)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(response.data['total_count'], 3)
+        
+        for limit in ('0', 'x'):
+            response = self.client.get(f"{self.ranking_suppliers_url}?product_id=456&limit={limit}", format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, f"limit={limit}")
+    
+    def test_qtable_filters(self):
+        """min_q_value filters and limit caps the exported entries, highest Q-values first"""
+        top_state = QLearningState.objects.create(name="Q5_D5_P5_S5")
+        QTableEntry.objects.create(state=self.next_state, action=self.rank_action, q_value=0.85)
+        QTableEntry.objects.create(state=self.quality_state, action=self.explore_action, q_value=0.60)
+        QTableEntry.objects.create(state=self.next_state, action=self.explore_action, q_value=-0.5)
+        QTableEntry.objects.create(state=top_state, action=self.rank_action, q_value=0.95)
+        QTableEntry.objects.create(state=top_state, action=self.explore_action, q_value=0.1)
+        
+        response = self.client.get(f"{self.qtable_url}?min_q_value=0&limit=3", format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [entry['q_value'] for entry in response.data['q_table_entries']],
+            [0.95, 0.85, 0.75]
+        )
+        self.assertEqual(response.data['count'], 3)
+    
+    def test_qtable_invalid_filters(self):
+        """Malformed Q-table filters are rejected with field errors"""
+        response = self.client.get(f"{self.qtable_url}?min_q_value=x", format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('min_q_value', response.data)
+        
+        response = self.client.get(f"{self.qtable_url}?limit=0", format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('limit', response.data)
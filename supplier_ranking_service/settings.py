@@ -200,6 +200,10 @@ Q_LEARNING_CONFIG = {
     'exploration_rate': 0.3,
 }
 
+# Run manual training jobs in the request thread instead of a background
+# worker thread; tests need this so their writes stay in the test transaction
+TRAINING_JOBS_INLINE = False
+
 # Weights for ranking calculation
 RANKING_WEIGHTS = {
     'quality': 0.25,